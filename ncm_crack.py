@@ -6,46 +6,138 @@
 import argparse
 import base64
 import binascii
-import json
+import functools
+import mmap
 import os
+import queue
+import re
 import shutil
 import struct
 import time
 import warnings
-from concurrent.futures import ThreadPoolExecutor, wait
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import TYPE_CHECKING, Optional, Tuple
 
-import eyed3
-import psutil
-import requests
+import numpy as np
 from Crypto.Cipher import AES
-from Crypto.Util.strxor import strxor
-from mutagen.flac import FLAC, Picture
-from mutagen.id3 import ID3
-from mutagen.id3._frames import APIC, TIT2, TPE1, TPE2, TALB, TDRC, TRCK, COMM, TLEN
-from mutagen.mp3 import MP3
+from Crypto.Util.Padding import unpad
 from tqdm import tqdm
 
+if TYPE_CHECKING:
+    import requests
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson 为可选依赖，缺失时使用标准库 json
+    from json import loads as json_loads
+
+
 # ==================== 常量定义 ====================
 CORE_KEY = binascii.a2b_hex("687A4852416D736F356B496E62617857")
 META_KEY = binascii.a2b_hex("2331346C6A6B5F215C5D2630553C2728")
-NCM_HEADER = b"4354454e4644414d"
-CHUNK_SIZE = 0x8000  # 32KB
+NCM_HEADER = b"CTENFDAM"
+CHUNK_SIZE = 0x100000  # 1MB
 MAX_RETRIES = 3
 RETRY_DELAY = 5
-MAX_CPU_PERCENT = 100
 DEFAULT_USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
     "(KHTML, like Gecko) Chrome/100.0.4896.127 Safari/537.36"
 )
+ARTIST_SEPARATOR = re.compile(r"[;/]+")
+METADATA_PADDING = 4096  # 标签预留填充（字节）
+
+# ECB 模式不保存跨调用的状态，可复用同一个解密器
+_CORE_CIPHER = AES.new(CORE_KEY, AES.MODE_ECB)
+_META_CIPHER = AES.new(META_KEY, AES.MODE_ECB)
 
 
 # ==================== 工具函数 ====================
-def unpad(data: bytes) -> bytes:
-    """移除 PKCS7 填充"""
-    padding_len = data[-1] if isinstance(data[-1], int) else ord(data[-1])
-    return data[:-padding_len]
+def _build_mask_nb(key_data: np.ndarray, size: int) -> np.ndarray:
+    """由密钥直接生成解密掩码（由 _get_mask_kernel 交给 numba 编译为本地代码）
+
+    先执行 RC4 KSA 构建密钥盒，再生成 256 字节的掩码周期并平铺至 size 字节
+
+    Args:
+        key_data: 解密后的密钥（uint8 数组）
+        size: 掩码长度，须为 256 的整数倍
+
+    Returns:
+        uint8 掩码数组
+    """
+    key_box = np.arange(256, dtype=np.uint8)
+    key_length = len(key_data)
+    last_byte = 0
+    key_offset = 0
+
+    for i in range(256):
+        swap = key_box[i]
+        c = (int(swap) + last_byte + int(key_data[key_offset])) & 0xFF
+        key_offset = (key_offset + 1) % key_length
+        key_box[i] = key_box[c]
+        key_box[c] = swap
+        last_byte = c
+
+    mask = np.empty(size, dtype=np.uint8)
+    for i in range(256):
+        j = (i + 1) & 0xFF
+        kb_j = int(key_box[j])
+        mask[i] = key_box[(kb_j + int(key_box[(kb_j + j) & 0xFF])) & 0xFF]
+
+    # 掩码以 256 字节为周期重复
+    for offset in range(256, size, 256):
+        mask[offset : offset + 256] = mask[:256]
+
+    return mask
+
+
+def _build_mask_py(key_data: bytes, size: int) -> np.ndarray:
+    """由密钥生成解密掩码（未安装 numba 时使用）
+
+    _build_mask_nb 未编译时逐元素操作 NumPy 标量，速度很慢；
+    此处 KSA 在 bytearray 上执行，掩码周期则由 NumPy 向量化生成
+
+    Args:
+        key_data: 解密后的密钥
+        size: 掩码长度，须为 256 的整数倍
+
+    Returns:
+        uint8 掩码数组
+    """
+    key_box = bytearray(range(256))
+    key_length = len(key_data)
+    last_byte = 0
+    key_offset = 0
+
+    for i in range(256):
+        swap = key_box[i]
+        c = (swap + last_byte + key_data[key_offset]) & 0xFF
+        key_offset = (key_offset + 1) % key_length
+        key_box[i], key_box[c] = key_box[c], swap
+        last_byte = c
+
+    kb = np.frombuffer(key_box, dtype=np.uint8)
+    # 以 uint16 计算索引，避免 uint8 加法溢出
+    j = (np.arange(256, dtype=np.uint16) + 1) & 0xFF
+    kb_j = kb[j].astype(np.uint16)
+    mask = kb[(kb_j + kb[(kb_j + j) & 0xFF]) & 0xFF]
+    return np.tile(mask, size // 256)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_mask_kernel():
+    """获取 numba 编译的掩码生成函数（首次调用时导入 numba）
+
+    numba 导入耗时较长，且只有解密时才需要，因此不在模块加载时导入
+
+    Returns:
+        编译后的 _build_mask_nb，未安装 numba 时返回 None
+    """
+    try:
+        from numba import njit
+    except ImportError:  # numba 为可选依赖
+        return None
+    return njit(cache=True)(_build_mask_nb)
 
 
 def detect_audio_format(data: bytes) -> str:
@@ -57,50 +149,83 @@ def detect_audio_format(data: bytes) -> str:
     Returns:
         'flac' 或 'mp3'
     """
-    if len(data) >= 4 and data.startswith(b"fLaC"):
+    if data[:4] == b"fLaC":
         return "flac"
-    elif len(data) >= 3 and data.startswith(b"ID3"):
-        return "mp3"
-    elif len(data) >= 2 and data[0] == 0xFF and (data[1] & 0xE0) == 0xE0:
-        return "mp3"
-    return "mp3"  # 默认返回 mp3
+    # ID3 标签头、MPEG 帧同步字以及无法识别的数据均按 mp3 处理
+    return "mp3"
+
 
+@functools.lru_cache(maxsize=None)
+def _get_session() -> "requests.Session":
+    """获取下载封面用的 HTTP 会话（首次调用时创建）
 
-def download_image(url: str, save_path: str, max_retries: int = MAX_RETRIES) -> bool:
-    """下载图片并保存
+    复用连接池，避免每张图片都重新建立 TCP/TLS 连接
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    class FixedDelayRetry(Retry):
+        """每次重试前固定等待 RETRY_DELAY 秒（默认策略为指数退避）"""
+
+        def get_backoff_time(self) -> float:
+            return RETRY_DELAY
+
+    session = requests.Session()
+    session.headers["User-Agent"] = DEFAULT_USER_AGENT
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=64,
+        # 最多请求 MAX_RETRIES 次（首次请求 + MAX_RETRIES - 1 次重试）
+        max_retries=FixedDelayRetry(
+            total=MAX_RETRIES - 1,
+            status_forcelist=(429, 500, 502, 503, 504),
+        ),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def download_image(url: str) -> Optional[bytes]:
+    """下载图片
 
     Args:
         url: 图片 URL
-        save_path: 保存路径
-        max_retries: 最大重试次数
 
     Returns:
-        是否下载成功
+        图片数据（字节），下载失败时返回 None
     """
-    headers = {"User-Agent": DEFAULT_USER_AGENT}
+    try:
+        response = _get_session().get(url, timeout=30)
+        response.raise_for_status()
+        return response.content
 
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(url, headers=headers, timeout=30)
-            response.raise_for_status()
+    except Exception as e:
+        print(f"图片下载失败: {e}")
+        return None
 
-            with open(save_path, "wb") as f:
-                f.write(response.content)
-            return True
 
-        except Exception as e:
-            if attempt < max_retries - 1:
-                print(f"图片下载失败（尝试 {attempt + 1}/{max_retries}），等待重试...")
-                time.sleep(RETRY_DELAY)
-            else:
-                print(f"图片下载失败: {e}")
-                return False
+def _metadata_padding(info) -> int:
+    """保存标签时至少保留 METADATA_PADDING 字节填充
 
-    return False
+    后续修正元数据时可直接写入填充区，无需重写整个音频流
+    """
+    return max(info.padding, METADATA_PADDING)
+
+
+def _extract_artist_names(artists) -> list[str]:
+    """从 NCM 元数据中提取艺术家名称列表
+
+    NCM格式: [["Artist1", ID1], ["Artist2", ID2]]
+    """
+    if isinstance(artists, list):
+        return [a[0] if isinstance(a, list) and a else str(a) for a in artists]
+    return [str(artists)]
 
 
 def set_mp3_metadata(
-    mp3_path: str, metadata: dict, cover_data: Optional[bytes] = None
+    mp3_path: Path, metadata: dict, cover_data: Optional[bytes] = None
 ) -> bool:
     """为 MP3 文件设置完整元数据和封面
 
@@ -112,55 +237,38 @@ def set_mp3_metadata(
     Returns:
         是否设置成功
     """
-    try:
-        # 使用 mutagen 设置元数据
-        audio = MP3(mp3_path, ID3=ID3)
+    from mutagen.id3 import ID3, ID3NoHeaderError
+    from mutagen.id3._frames import APIC, COMM, TALB, TDRC, TIT2, TLEN, TPE1, TPE2
 
-        # 添加或创建 ID3 标签
+    try:
+        # 格式已知，只读取 ID3 标签，无需解析 MPEG 帧
         try:
-            audio.add_tags()
-        except Exception:
-            pass  # 标签已存在
+            tags = ID3(mp3_path)
+        except ID3NoHeaderError:
+            tags = ID3()  # 标签不存在，新建
 
         # 设置基本元数据
         if "musicName" in metadata:
-            audio.tags["TIT2"] = TIT2(encoding=3, text=metadata["musicName"])
+            tags["TIT2"] = TIT2(encoding=3, text=metadata["musicName"])
 
-        # 处理艺术家 - 使用分号分隔符（ID3v2标准推荐）
+        # 处理艺术家 - 使用分号+空格分隔多个艺术家（ID3v2标准推荐，最佳兼容性）
+        # 专辑艺术家与艺术家相同
         if "artist" in metadata:
-            artists = metadata["artist"]
-            if isinstance(artists, list):
-                # NCM格式: [["Artist1", ID1], ["Artist2", ID2]]
-                artist_names = [
-                    a[0] if isinstance(a, list) and a else str(a) for a in artists
-                ]
-                # 使用分号+空格分隔多个艺术家（最佳兼容性）
-                audio.tags["TPE1"] = TPE1(encoding=3, text="; ".join(artist_names))
-            else:
-                audio.tags["TPE1"] = TPE1(encoding=3, text=str(artists))
+            artist_text = "; ".join(_extract_artist_names(metadata["artist"]))
+            tags["TPE1"] = TPE1(encoding=3, text=artist_text)
+            tags["TPE2"] = TPE2(encoding=3, text=artist_text)
 
         if "album" in metadata:
-            audio.tags["TALB"] = TALB(encoding=3, text=metadata["album"])
-
-        # 专辑艺术家（与艺术家相同）
-        if "artist" in metadata:
-            artists = metadata["artist"]
-            if isinstance(artists, list):
-                artist_names = [
-                    a[0] if isinstance(a, list) and a else str(a) for a in artists
-                ]
-                audio.tags["TPE2"] = TPE2(encoding=3, text="; ".join(artist_names))
-            else:
-                audio.tags["TPE2"] = TPE2(encoding=3, text=str(artists))
+            tags["TALB"] = TALB(encoding=3, text=metadata["album"])
 
         if "publishTime" in metadata:
             year = str(metadata["publishTime"])[:4]  # 提取年份
-            audio.tags["TDRC"] = TDRC(encoding=3, text=year)
+            tags["TDRC"] = TDRC(encoding=3, text=year)
 
         # 时长（毫秒转换为毫秒，ID3v2.3/2.4使用毫秒）
         if "duration" in metadata:
             duration_ms = metadata["duration"]
-            audio.tags["TLEN"] = TLEN(encoding=3, text=str(duration_ms))
+            tags["TLEN"] = TLEN(encoding=3, text=str(duration_ms))
 
         # 添加备注信息（包含别名和翻译名）
         comments = []
@@ -169,13 +277,13 @@ def set_mp3_metadata(
         if "transNames" in metadata and metadata["transNames"]:
             comments.append("翻译: " + "; ".join(metadata["transNames"]))
         if comments:
-            audio.tags["COMM"] = COMM(
+            tags["COMM"] = COMM(
                 encoding=3, lang="chi", desc="", text="\n".join(comments)
             )
 
         # 添加封面
         if cover_data:
-            audio.tags["APIC"] = APIC(
+            tags["APIC"] = APIC(
                 encoding=3,
                 mime="image/jpeg",
                 type=3,  # Cover (front)
@@ -183,7 +291,7 @@ def set_mp3_metadata(
                 data=cover_data,
             )
 
-        audio.save()
+        tags.save(mp3_path, padding=_metadata_padding)
         return True
 
     except Exception as e:
@@ -192,7 +300,7 @@ def set_mp3_metadata(
 
 
 def set_flac_metadata(
-    flac_path: str, metadata: dict, cover_data: Optional[bytes] = None
+    flac_path: Path, metadata: dict, cover_data: Optional[bytes] = None
 ) -> bool:
     """为 FLAC 文件设置完整元数据和封面
 
@@ -204,6 +312,8 @@ def set_flac_metadata(
     Returns:
         是否设置成功
     """
+    from mutagen.flac import FLAC, Picture
+
     try:
         audio = FLAC(flac_path)
 
@@ -212,32 +322,16 @@ def set_flac_metadata(
             audio["TITLE"] = metadata["musicName"]
 
         # 处理艺术家 - Vorbis Comments支持列表（推荐方式）
+        # 直接传递列表，mutagen会自动创建多个ARTIST字段（Vorbis标准）
+        # 专辑艺术家与艺术家相同
         if "artist" in metadata:
-            artists = metadata["artist"]
-            if isinstance(artists, list):
-                # NCM格式: [["Artist1", ID1], ["Artist2", ID2]]
-                artist_names = [
-                    a[0] if isinstance(a, list) and a else str(a) for a in artists
-                ]
-                # 直接传递列表，mutagen会自动创建多个ARTIST字段（Vorbis标准）
-                audio["ARTIST"] = artist_names
-            else:
-                audio["ARTIST"] = str(artists)
+            artist_names = _extract_artist_names(metadata["artist"])
+            audio["ARTIST"] = artist_names
+            audio["ALBUMARTIST"] = artist_names
 
         if "album" in metadata:
             audio["ALBUM"] = metadata["album"]
 
-        # 专辑艺术家（与艺术家相同）
-        if "artist" in metadata:
-            artists = metadata["artist"]
-            if isinstance(artists, list):
-                artist_names = [
-                    a[0] if isinstance(a, list) and a else str(a) for a in artists
-                ]
-                audio["ALBUMARTIST"] = artist_names
-            else:
-                audio["ALBUMARTIST"] = str(artists)
-
         if "publishTime" in metadata:
             year = str(metadata["publishTime"])[:4]
             audio["DATE"] = year
@@ -274,7 +368,7 @@ def set_flac_metadata(
             audio.clear_pictures()
             audio.add_picture(picture)
 
-        audio.save()
+        audio.save(padding=_metadata_padding)
         return True
 
     except Exception as e:
@@ -282,7 +376,7 @@ def set_flac_metadata(
         return False
 
 
-def fix_mp3_artist_metadata(mp3_path: str) -> bool:
+def fix_mp3_artist_metadata(mp3_path: Path) -> bool:
     """修正 MP3 文件中使用 / 或混合分隔符的艺术家元数据
 
     Args:
@@ -291,56 +385,41 @@ def fix_mp3_artist_metadata(mp3_path: str) -> bool:
     Returns:
         是否修正成功（如果无需修正则返回 None）
     """
+    from mutagen.id3 import ID3, ID3NoHeaderError
+    from mutagen.id3._frames import TPE1, TPE2
+
     try:
-        audio = MP3(mp3_path, ID3=ID3)
-        if audio.tags is None:
+        try:
+            tags = ID3(mp3_path)
+        except ID3NoHeaderError:
             return None
 
         modified = False
 
         def clean_artist_string(artist_text):
-            """清理艺术家字符串，处理多种分隔符"""
-            # 去除首尾空格和末尾的分号
-            artist_text = artist_text.strip().rstrip(";").strip()
-
-            # 检查是否需要处理
-            if "/" not in artist_text and "; " in artist_text:
-                # 已经是标准格式，无需处理
-                return None, artist_text
-
-            if "/" in artist_text or ";" in artist_text:
-                # 需要处理：先替换分号为斜杠，统一处理
-                artist_text = artist_text.replace(";", "/")
-                artists = [a.strip() for a in artist_text.split("/") if a.strip()]
-                # 去重并保持顺序
-                seen = set()
-                unique_artists = []
-                for artist in artists:
-                    if artist not in seen:
-                        seen.add(artist)
-                        unique_artists.append(artist)
-                return True, "; ".join(unique_artists)
-
-            return None, artist_text
+            """清理艺术家字符串，统一使用 "; " 分隔并去重"""
+            parts = (p.strip() for p in ARTIST_SEPARATOR.split(artist_text))
+            cleaned_text = "; ".join(dict.fromkeys(p for p in parts if p))
+            return cleaned_text != artist_text, cleaned_text
 
         # 检查并修正艺术家字段（TPE1）
-        if "TPE1" in audio.tags:
-            artist_text = str(audio.tags["TPE1"].text[0])
+        if "TPE1" in tags:
+            artist_text = str(tags["TPE1"].text[0])
             needs_fix, cleaned_text = clean_artist_string(artist_text)
             if needs_fix:
-                audio.tags["TPE1"] = TPE1(encoding=3, text=cleaned_text)
+                tags["TPE1"] = TPE1(encoding=3, text=cleaned_text)
                 modified = True
 
         # 检查并修正专辑艺术家字段（TPE2）
-        if "TPE2" in audio.tags:
-            album_artist_text = str(audio.tags["TPE2"].text[0])
+        if "TPE2" in tags:
+            album_artist_text = str(tags["TPE2"].text[0])
             needs_fix, cleaned_text = clean_artist_string(album_artist_text)
             if needs_fix:
-                audio.tags["TPE2"] = TPE2(encoding=3, text=cleaned_text)
+                tags["TPE2"] = TPE2(encoding=3, text=cleaned_text)
                 modified = True
 
         if modified:
-            audio.save()
+            tags.save(mp3_path, padding=_metadata_padding)
             return True
         return None
 
@@ -349,7 +428,7 @@ def fix_mp3_artist_metadata(mp3_path: str) -> bool:
         return False
 
 
-def fix_flac_artist_metadata(flac_path: str) -> bool:
+def fix_flac_artist_metadata(flac_path: Path) -> bool:
     """修正 FLAC 文件中使用 / 或 ; 分隔的艺术家元数据
 
     Args:
@@ -358,36 +437,21 @@ def fix_flac_artist_metadata(flac_path: str) -> bool:
     Returns:
         是否修正成功（如果无需修正则返回 None）
     """
+    from mutagen.flac import FLAC
+
     try:
         audio = FLAC(flac_path)
         modified = False
 
         def clean_artist_list(artists_input):
             """清理并分割艺术家列表"""
-            new_artists = []
-            needs_fix = False
-
-            for artist in artists_input:
-                # 先去除首尾空格和末尾的分号
-                artist_cleaned = artist.strip().rstrip(";").strip()
-
-                # 检查是否包含分隔符
-                if "/" in artist_cleaned or ";" in artist_cleaned:
-                    needs_fix = True
-                    # 先按分号分割，再按斜杠分割
-                    parts = artist_cleaned.split(";")
-                    for part in parts:
-                        sub_parts = part.split("/")
-                        for sub_part in sub_parts:
-                            cleaned = sub_part.strip()
-                            if cleaned and cleaned not in new_artists:
-                                new_artists.append(cleaned)
-                else:
-                    # 没有分隔符，直接添加
-                    if artist_cleaned and artist_cleaned not in new_artists:
-                        new_artists.append(artist_cleaned)
-
-            return new_artists, needs_fix
+            parts = (
+                p.strip()
+                for artist in artists_input
+                for p in ARTIST_SEPARATOR.split(artist)
+            )
+            new_artists = list(dict.fromkeys(p for p in parts if p))
+            return new_artists, new_artists != list(artists_input)
 
         # 检查并修正艺术家字段
         if "ARTIST" in audio:
@@ -404,7 +468,7 @@ def fix_flac_artist_metadata(flac_path: str) -> bool:
                 modified = True
 
         if modified:
-            audio.save()
+            audio.save(padding=_metadata_padding)
             return True
         return None
 
@@ -413,23 +477,21 @@ def fix_flac_artist_metadata(flac_path: str) -> bool:
         return False
 
 
-def fix_audio_metadata(audio_path: str) -> bool:
+def fix_audio_metadata(audio_path: Path, file_format: str) -> bool:
     """修正音频文件中的艺术家元数据（支持 MP3 和 FLAC）
 
     Args:
         audio_path: 音频文件路径
+        file_format: 音频格式（'mp3' 或 'flac'）
 
     Returns:
         是否修正成功（如果无需修正则返回 None）
     """
-    audio_path = Path(audio_path)
-    file_format = audio_path.suffix.lower()[1:]
-
     try:
         if file_format == "mp3":
-            return fix_mp3_artist_metadata(str(audio_path))
+            return fix_mp3_artist_metadata(audio_path)
         elif file_format == "flac":
-            return fix_flac_artist_metadata(str(audio_path))
+            return fix_flac_artist_metadata(audio_path)
         else:
             return None
     except Exception as e:
@@ -437,19 +499,17 @@ def fix_audio_metadata(audio_path: str) -> bool:
         return False
 
 
-def set_audio_metadata(audio_path: str, metadata: dict) -> bool:
+def set_audio_metadata(audio_path: Path, metadata: dict, file_format: str) -> bool:
     """为音频文件设置完整元数据和封面（支持 MP3 和 FLAC）
 
     Args:
         audio_path: 音频文件路径
         metadata: 元数据字典
+        file_format: 音频格式（'mp3' 或 'flac'）
 
     Returns:
         是否设置成功
     """
-    audio_path = Path(audio_path)
-    file_format = audio_path.suffix.lower()[1:]  # 移除点号
-
     # 下载封面图片
     cover_data = None
     cover_url = metadata.get("albumPic", "")
@@ -457,25 +517,16 @@ def set_audio_metadata(audio_path: str, metadata: dict) -> bool:
     if cover_url:
         # 支持 JPG 和 PNG 格式
         if cover_url.lower().endswith((".jpg", ".jpeg", ".png")):
-            temp_cover = audio_path.parent / f".temp_{audio_path.stem}_cover.jpg"
-            try:
-                if download_image(cover_url, str(temp_cover)):
-                    with open(temp_cover, "rb") as f:
-                        cover_data = f.read()
-                    temp_cover.unlink()
-            except Exception as e:
-                warnings.warn(f"下载封面失败: {e}")
-                if temp_cover.exists():
-                    temp_cover.unlink()
+            cover_data = download_image(cover_url)
         else:
             warnings.warn(f"不支持的封面格式: {cover_url}")
 
     # 根据格式设置元数据
     try:
         if file_format == "mp3":
-            return set_mp3_metadata(str(audio_path), metadata, cover_data)
+            return set_mp3_metadata(audio_path, metadata, cover_data)
         elif file_format == "flac":
-            return set_flac_metadata(str(audio_path), metadata, cover_data)
+            return set_flac_metadata(audio_path, metadata, cover_data)
         else:
             warnings.warn(f"不支持的音频格式: {file_format}")
             return False
@@ -491,70 +542,64 @@ class NCMDecryptor:
     def __init__(self, input_path: str):
         self.input_path = Path(input_path)
         self.metadata = None
-        self.key_box = None
 
-    def _read_key_data(self, file) -> bytes:
-        """读取并解密密钥数据"""
-        file.seek(2, 1)  # 跳过2字节
-        key_length = struct.unpack("<I", file.read(4))[0]
+    def _read_key_data(self, mm: mmap.mmap, pos: int) -> Tuple[bytes, int]:
+        """读取并解密密钥数据
+
+        Returns:
+            (密钥数据, 下一字段的偏移)
+        """
+        pos += 2  # 跳过2字节
+        (key_length,) = struct.unpack_from("<I", mm, pos)
+        pos += 4
 
         # XOR 解密
-        key_data = bytearray(file.read(key_length))
-        for i in range(len(key_data)):
-            key_data[i] ^= 0x64
+        key_data = (
+            np.frombuffer(mm[pos : pos + key_length], dtype=np.uint8) ^ np.uint8(0x64)
+        ).tobytes()
 
         # AES 解密
-        cipher = AES.new(CORE_KEY, AES.MODE_ECB)
-        return unpad(cipher.decrypt(bytes(key_data)))[17:]
+        key_data = unpad(_CORE_CIPHER.decrypt(key_data), AES.block_size)[17:]
+        return key_data, pos + key_length
 
-    def _build_key_box(self, key_data: bytes) -> bytearray:
-        """构建密钥盒"""
-        key_box = bytearray(range(256))
-        key_length = len(key_data)
-        last_byte = 0
-        key_offset = 0
+    def _read_metadata(self, mm: mmap.mmap, pos: int) -> Tuple[dict, int]:
+        """读取并解密元数据
 
-        for i in range(256):
-            swap = key_box[i]
-            c = (swap + last_byte + key_data[key_offset]) & 0xFF
-            key_offset = (key_offset + 1) % key_length
-            key_box[i], key_box[c] = key_box[c], swap
-            last_byte = c
+        Returns:
+            (元数据字典, 下一字段的偏移)
+        """
+        (meta_length,) = struct.unpack_from("<I", mm, pos)
+        pos += 4
 
-        return key_box
+        # XOR 解密（跳过 22 字节的 "163 key(Don't modify):" 前缀，无需再切片复制）
+        meta_data = (
+            np.frombuffer(mm[pos + 22 : pos + meta_length], dtype=np.uint8)
+            ^ np.uint8(0x63)
+        ).tobytes()
 
-    def _read_metadata(self, file) -> dict:
-        """读取并解密元数据"""
-        meta_length = struct.unpack("<I", file.read(4))[0]
+        # Base64 + AES 解密
+        meta_data = base64.b64decode(meta_data)
+        meta_bytes = unpad(_META_CIPHER.decrypt(meta_data), AES.block_size)
 
-        # XOR 解密
-        meta_data = bytearray(file.read(meta_length))
-        for i in range(len(meta_data)):
-            meta_data[i] ^= 0x63
+        # 跳过 "music:" 前缀，直接解析 UTF-8 字节
+        return json_loads(meta_bytes[6:]), pos + meta_length
 
-        # Base64 + AES 解密
-        meta_data = base64.b64decode(bytes(meta_data)[22:])
-        cipher = AES.new(META_KEY, AES.MODE_ECB)
-        meta_json = unpad(cipher.decrypt(meta_data)).decode("utf-8")[6:]
-
-        return json.loads(meta_json)
-
-    def _create_decryption_mask(self) -> bytes:
-        """创建解密掩码"""
-        mask = bytearray(256)
-        for i in range(256):
-            j = (i + 1) & 0xFF
-            mask[i] = self.key_box[
-                (self.key_box[j] + self.key_box[(self.key_box[j] + j) & 0xFF]) & 0xFF
-            ]
-        return bytes(mask) * (CHUNK_SIZE // 256)
-
-    def _skip_image_data(self, file):
-        """跳过嵌入的图片数据"""
-        file.read(4)  # CRC32
-        file.seek(5, 1)  # 跳过5字节
-        image_size = struct.unpack("<I", file.read(4))[0]
-        file.seek(image_size, 1)  # 跳过图片数据
+    def _create_decryption_mask(self, key_data: bytes) -> np.ndarray:
+        """创建解密掩码（平铺至 CHUNK_SIZE）"""
+        kernel = _get_mask_kernel()
+        if kernel is None:
+            return _build_mask_py(key_data, CHUNK_SIZE)
+        return kernel(np.frombuffer(key_data, dtype=np.uint8), CHUNK_SIZE)
+
+    def _skip_image_data(self, mm: mmap.mmap, pos: int) -> int:
+        """跳过嵌入的图片数据
+
+        Returns:
+            音频数据起始偏移
+        """
+        pos += 4 + 5  # CRC32 + 跳过5字节
+        (image_size,) = struct.unpack_from("<I", mm, pos)
+        return pos + 4 + image_size  # 跳过图片数据
 
     def decrypt(self, output_path: str) -> Tuple[str, Optional[dict]]:
         """解密 NCM 文件
@@ -565,54 +610,63 @@ class NCMDecryptor:
         Returns:
             (实际输出路径, 元数据字典)
         """
-        with open(self.input_path, "rb") as f:
+        output_path = Path(output_path)
+
+        # 整个文件只映射一次，各字段通过偏移直接切片读取
+        with (
+            open(self.input_path, "rb") as f,
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+        ):
             # 验证文件头
-            header = f.read(8)
-            if binascii.b2a_hex(header) != NCM_HEADER:
+            header = mm[:8]
+            if header != NCM_HEADER:
                 raise ValueError("不是有效的 NCM 文件")
 
             # 读取密钥和元数据
-            key_data = self._read_key_data(f)
-            self.key_box = self._build_key_box(key_data)
-            self.metadata = self._read_metadata(f)
+            key_data, pos = self._read_key_data(mm, 8)
+            self.metadata, pos = self._read_metadata(mm, pos)
 
             # 跳过图片数据
-            self._skip_image_data(f)
+            audio_start = self._skip_image_data(mm, pos)
 
             # 创建解密掩码
-            full_mask = self._create_decryption_mask()
+            full_mask = self._create_decryption_mask(key_data)
 
             # 解密音频数据并检测格式
-            output_path = Path(output_path)
-            temp_path = output_path.with_suffix(".tmp")
-            actual_format = self.metadata.get("format", "mp3")
-
-            with open(temp_path, "wb") as out:
-                first_chunk = True
-
-                while True:
-                    chunk = f.read(CHUNK_SIZE)
-                    if not chunk:
-                        break
-
-                    # 解密
-                    chunk_len = len(chunk)
-                    decrypted = strxor(chunk, full_mask[:chunk_len])
-
-                    # 检测实际格式
-                    if first_chunk:
-                        actual_format = detect_audio_format(decrypted)
-                        first_chunk = False
-
-                    out.write(decrypted)
-
-            # 重命名为正确的扩展名
-            final_path = output_path.with_suffix(f".{actual_format}")
-            if final_path.exists():
-                final_path.unlink()
-            temp_path.rename(final_path)
-
-            return str(final_path), self.metadata
+            audio = np.frombuffer(mm, dtype=np.uint8, offset=audio_start)
+            try:
+                # 预先解密文件头以检测实际格式
+                head_len = min(4, len(audio))
+                actual_format = detect_audio_format(
+                    np.bitwise_xor(audio[:head_len], full_mask[:head_len]).tobytes()
+                )
+                final_path = output_path.with_suffix(f".{actual_format}")
+
+                # 先写入同目录下的临时文件，完成后再替换，避免中断时破坏已有文件
+                temp_path = output_path.with_suffix(".tmp")
+
+                # 复用同一块输出缓冲区；NumPy 在异或期间会释放 GIL
+                buffer = np.empty(CHUNK_SIZE, dtype=np.uint8)
+                try:
+                    with open(temp_path, "wb") as out:
+                        for offset in range(0, len(audio), CHUNK_SIZE):
+                            chunk_len = min(CHUNK_SIZE, len(audio) - offset)
+                            decrypted = buffer[:chunk_len]
+                            np.bitwise_xor(
+                                audio[offset : offset + chunk_len],
+                                full_mask[:chunk_len],
+                                out=decrypted,
+                            )
+                            out.write(decrypted)
+                    os.replace(temp_path, final_path)
+                except BaseException:
+                    temp_path.unlink(missing_ok=True)
+                    raise
+            finally:
+                # 释放对 mmap 的引用，否则无法关闭
+                del audio
+
+        return str(final_path), self.metadata
 
 
 # ==================== 批量转换器 ====================
@@ -655,6 +709,9 @@ class BatchConverter:
         # 是否覆写已存在的文件
         self.overwrite = overwrite
 
+        # 输出目录的文件名缓存，每个目录只列举一次
+        self._dir_cache: dict[Path, set[str]] = {}
+
     def _get_relative_output_path(self, input_file: Path) -> Path:
         """获取文件对应的输出路径（保持目录结构）"""
         rel_path = input_file.relative_to(self.input_dir)
@@ -667,16 +724,16 @@ class BatchConverter:
             return False
 
         parent_dir = output_path.parent
-        base_path = parent_dir / base_name
-        return (
-            base_path.with_suffix(".mp3").exists()
-            or base_path.with_suffix(".flac").exists()
-        )
+        names = self._dir_cache.get(parent_dir)
+        if names is None:
+            names = set(os.listdir(parent_dir)) if parent_dir.is_dir() else set()
+            self._dir_cache[parent_dir] = names
+        return f"{base_name}.mp3" in names or f"{base_name}.flac" in names
 
-    def _convert_single_file(
+    def _decrypt_single_file(
         self, ncm_path: Path, output_path: Path, max_retries: int = 5
-    ) -> Optional[bool]:
-        """转换单个 NCM 文件
+    ) -> Optional[Tuple[str, Optional[dict]]]:
+        """解密单个 NCM 文件（在进程池中执行）
 
         Args:
             ncm_path: NCM 文件路径
@@ -684,42 +741,54 @@ class BatchConverter:
             max_retries: 最大重试次数
 
         Returns:
-            True: 成功, False: 失败, None: 跳过
+            成功时返回 (实际输出路径, 元数据字典)，失败时返回 None
         """
-        # 检查是否已转换
         base_name = ncm_path.stem
-        if self._is_already_converted(output_path, base_name):
-            return None
-
-        # 确保输出目录存在
-        output_path.parent.mkdir(parents=True, exist_ok=True)
 
         # 多次重试
         for attempt in range(max_retries):
             try:
-                # CPU 使用率控制
-                while psutil.cpu_percent(1) > MAX_CPU_PERCENT:
-                    time.sleep(0.5)
-
-                # 解密文件
                 temp_output = output_path.parent / f"{base_name}.mp3"  # 临时扩展名
                 decryptor = NCMDecryptor(str(ncm_path))
-                final_path, metadata = decryptor.decrypt(str(temp_output))
+                return decryptor.decrypt(str(temp_output))
 
-                # 设置元数据和封面
-                if metadata:
-                    set_audio_metadata(final_path, metadata)
-
-                return True
+            except (ValueError, struct.error) as e:
+                # 文件格式错误（含 JSON/Base64/填充校验失败），重试无意义
+                print(f"转换失败: {ncm_path} - {e}")
+                return None
 
             except Exception as e:
                 if attempt < max_retries - 1:
+                    # 输出目录已在 convert_all 中预先创建，此处防止其被外部删除
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
                     time.sleep(3)
                 else:
                     print(f"转换失败: {ncm_path} - {e}")
-                    return False
+                    return None
 
-        return False
+        return None
+
+    @staticmethod
+    def _write_metadata(audio_path: str, metadata: Optional[dict]) -> bool:
+        """为解密后的音频设置元数据和封面（在线程池中执行）
+
+        Args:
+            audio_path: 解密后的音频文件路径
+            metadata: 元数据字典
+
+        Returns:
+            是否转换成功（元数据设置失败只会给出警告，不影响转换结果；
+            元数据格式异常等意外错误则视为转换失败）
+        """
+        try:
+            if metadata:
+                audio_path = Path(audio_path)
+                set_audio_metadata(audio_path, metadata, audio_path.suffix[1:])
+            return True
+
+        except Exception as e:
+            warnings.warn(f"设置元数据失败: {audio_path} - {e}")
+            return False
 
     def _copy_single_file(self, src_path: Path, dst_path: Path) -> bool:
         """复制单个非 NCM 文件，并修正音频文件的元数据
@@ -732,67 +801,81 @@ class BatchConverter:
             是否复制成功（True: 成功, False: 失败, None: 跳过）
         """
         try:
-            # 检查是否需要覆写
-            if dst_path.exists() and not self.overwrite:
-                return None
+            src_stat = src_path.stat()
 
-            # 确保目标目录存在
-            dst_path.parent.mkdir(parents=True, exist_ok=True)
+            # 检查是否需要覆写
+            try:
+                dst_stat = dst_path.stat()
+            except FileNotFoundError:
+                dst_stat = None
+            if dst_stat is not None:
+                if not self.overwrite:
+                    return None
+                # 大小与修改时间均未变化，视为同一文件（容差兼容 FAT 的 2 秒精度）
+                if (
+                    dst_stat.st_size == src_stat.st_size
+                    and abs(dst_stat.st_mtime - src_stat.st_mtime) < 2
+                ):
+                    return None
 
             # 判断是否为音频文件
-            is_audio = dst_path.suffix.lower() in [".mp3", ".flac"]
+            file_format = dst_path.suffix.lower()[1:]
+            is_audio = file_format in ("mp3", "flac")
 
-            # 复制文件
-            shutil.copy2(src_path, dst_path)
+            # 复制文件（copyfile 可使用 sendfile 等零拷贝路径）
+            try:
+                shutil.copyfile(src_path, dst_path)
+            except FileNotFoundError:
+                # 输出目录已在 convert_all 中预先创建，此处防止其被外部删除
+                dst_path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(src_path, dst_path)
 
             # 如果是音频文件，修正元数据
             if is_audio:
-                fix_result = fix_audio_metadata(str(dst_path))
+                fix_result = fix_audio_metadata(dst_path, file_format)
                 # fix_result: True=已修正, False=失败, None=无需修正
                 # 即使修正失败，复制操作也算成功
 
+            # 保留源文件的时间戳（在修正元数据之后设置）
+            os.utime(dst_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+
             return True
 
         except Exception as e:
             print(f"复制文件失败: {src_path} -> {dst_path}: {e}")
             return False
 
-    def _is_blacklisted(self, path: Path) -> bool:
-        """检查路径是否在黑名单中
-
-        Args:
-            path: 要检查的路径
-
-        Returns:
-            是否在黑名单中
-        """
-        # 检查路径中的所有文件夹名称
-        for part in path.parts:
-            if part in self.folder_blacklist:
-                return True
-        return False
-
     def _collect_all_files(self) -> Tuple[list, list]:
         """收集所有需要处理的文件
 
+        使用 os.scandir 迭代遍历，黑名单中的文件夹不会被进入
+
         Returns:
             (ncm_files列表, other_files列表)
         """
         ncm_files = []
         other_files = []
 
-        # 递归遍历所有文件
-        for file_path in self.input_dir.rglob("*"):
-            if file_path.is_file():
-                # 检查是否在黑名单中
-                rel_path = file_path.relative_to(self.input_dir)
-                if self._is_blacklisted(rel_path):
-                    continue
-
-                if file_path.suffix.lower() == ".ncm":
-                    ncm_files.append(file_path)
-                else:
-                    other_files.append(file_path)
+        stack = [str(self.input_dir)]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except OSError:
+                continue  # 跳过无权限访问的文件夹（与 Path.rglob 行为一致）
+
+            with entries:
+                for entry in entries:
+                    # 检查是否在黑名单中
+                    if entry.name in self.folder_blacklist:
+                        continue
+
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        if entry.name.lower().endswith(".ncm"):
+                            ncm_files.append(Path(entry.path))
+                        else:
+                            other_files.append(Path(entry.path))
 
         return ncm_files, other_files
 
@@ -800,7 +883,7 @@ class BatchConverter:
         """批量转换所有 NCM 文件并复制其他文件
 
         Args:
-            max_workers: 最大线程数，默认为 CPU 核心数的 80%
+            max_workers: 最大并发数，默认为 CPU 核心数的 80%
 
         Returns:
             统计字典 {'ncm_success': int, 'ncm_failed': int, 'ncm_skipped': int,
@@ -839,47 +922,91 @@ class BatchConverter:
             "copy_skipped": 0,
         }
 
-        # 并行处理
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = []
-
-            # 提交 NCM 转换任务
-            for ncm_file in ncm_files:
-                output_path = self._get_relative_output_path(ncm_file)
-                future = executor.submit(
-                    self._convert_single_file, ncm_file, output_path
+        # 在主进程中过滤已转换的文件，避免把无需处理的任务提交给进程池
+        pending_ncm = []
+        for ncm_file in ncm_files:
+            output_path = self._get_relative_output_path(ncm_file)
+            if self._is_already_converted(output_path, ncm_file.stem):
+                stats["ncm_skipped"] += 1
+            else:
+                pending_ncm.append((ncm_file, output_path))
+        # 转换开始后列举结果即失效，且不应随任务序列化到子进程
+        self._dir_cache.clear()
+
+        copy_tasks = [(f, self._get_relative_output_path(f)) for f in other_files]
+
+        # 预先创建所有输出目录，每个目录只需创建一次
+        output_dirs = {output_path.parent for _, output_path in pending_ncm}
+        output_dirs.update(dst_path.parent for _, dst_path in copy_tasks)
+        for output_dir in output_dirs:
+            output_dir.mkdir(parents=True, exist_ok=True)
+
+        # 并行处理：NCM 解密为 CPU 密集型，使用进程池绕开 GIL；
+        # 元数据写入（含封面下载）与文件复制为 I/O 密集型，线程大多在等待
+        # 网络或磁盘，使用两倍数量的线程池。元数据写入使用独立的线程池，
+        # 不必排在已提交的全部复制任务之后，解密完成后即可写入标签
+        with (
+            ProcessPoolExecutor(max_workers=max_workers) as process_pool,
+            ThreadPoolExecutor(max_workers=max_workers * 2) as thread_pool,
+            ThreadPoolExecutor(max_workers=max_workers * 2) as metadata_pool,
+            tqdm(
+                total=total_files,
+                desc="处理进度",
+                unit="文件",
+                mininterval=0.25,  # 限制刷新频率，避免大量小文件时频繁重绘
+                smoothing=0.1,
+            ) as pbar,
+        ):
+            pbar.update(stats["ncm_skipped"])
+
+            # 任务完成时回调只将 future 放入队列，由主线程按完成顺序取出统计；
+            # 每次等待只涉及一个 future，总开销随任务数线性增长
+            completed = queue.SimpleQueue()
+            future_types = {}
+
+            def submit(pool, task_type, fn, *args):
+                future = pool.submit(fn, *args)
+                future_types[future] = task_type
+                future.add_done_callback(completed.put)
+
+            # 提交 NCM 解密任务
+            for ncm_file, output_path in pending_ncm:
+                submit(
+                    process_pool,
+                    "decrypt",
+                    self._decrypt_single_file,
+                    ncm_file,
+                    output_path,
                 )
-                futures.append(("ncm", future))
 
             # 提交文件复制任务
-            for other_file in other_files:
-                dst_path = self._get_relative_output_path(other_file)
-                future = executor.submit(self._copy_single_file, other_file, dst_path)
-                futures.append(("copy", future))
-
-            # 显示进度
-            with tqdm(total=len(futures), desc="处理进度", unit="文件") as pbar:
-                for file_type, future in futures:
-                    future.add_done_callback(lambda _: pbar.update(1))
-                wait([f for _, f in futures])
-
-            # 统计结果
-            for file_type, future in futures:
+            for other_file, dst_path in copy_tasks:
+                submit(
+                    thread_pool, "copy", self._copy_single_file, other_file, dst_path
+                )
+
+            # 在主线程中按完成顺序统计结果并更新进度
+            while future_types:
+                future = completed.get()
+                task_type = future_types.pop(future)
                 result = future.result()
-                if file_type == "ncm":
-                    if result is True:
-                        stats["ncm_success"] += 1
-                    elif result is False:
+
+                if task_type == "decrypt":
+                    if result is None:
                         stats["ncm_failed"] += 1
+                        pbar.update(1)
                     else:
-                        stats["ncm_skipped"] += 1
-                else:  # copy
-                    if result is True:
-                        stats["copy_success"] += 1
-                    elif result is False:
-                        stats["copy_failed"] += 1
-                    else:
-                        stats["copy_skipped"] += 1
+                        # 将元数据写入交给独立线程池，与后续文件的解密重叠执行
+                        submit(metadata_pool, "ncm", self._write_metadata, *result)
+                    continue
+
+                if result is True:
+                    stats[f"{task_type}_success"] += 1
+                elif result is False:
+                    stats[f"{task_type}_failed"] += 1
+                else:
+                    stats[f"{task_type}_skipped"] += 1
+                pbar.update(1)
 
         return stats
 